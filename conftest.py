@@ -0,0 +1,2 @@
+# test_script.py and test_printer_pairs.py are manual scripts that drive real printers on Windows
+collect_ignore = ["test_script.py", "test_printer_pairs.py"]
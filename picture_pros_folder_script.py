@@ -13,13 +13,11 @@ from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from typing import Dict, List, Optional, Tuple
-import win32evtlog
-import win32evtlogutil
-import win32con
-import win32api
 
 # Configuration
 MASTER_FOLDER = r"C:\Users\colem\Desktop\MasterPrintFolder"
+PRINTER_FOLDER_ROOT = r"C:/Users/colem/Desktop"
+FILE_SETTLE_DELAY = 0.2  # seconds to wait for a new file to be fully written
 PROCESSED_FILES = set()
 
 # Printer Pairs (fill in the actual printer names)
@@ -63,18 +61,21 @@ for pair in PRINTER_PAIRS:
 # Track last printed document per printer (from operational log)
 LAST_PRINTED_DOCUMENT = {}
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('picture_pros.log'),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
+def setup_logging():
+    """Log to both the console and picture_pros.log."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('picture_pros.log'),
+            logging.StreamHandler()
+        ]
+    )
+
+
 def is_printer_available(printer_name: str) -> bool:
     """Check if a printer is available and connected."""
     try:
@@ -159,6 +160,9 @@ def is_printer_free(printer_name: str) -> bool:
         return False
         
     try:
+        import win32evtlog
+        import win32evtlogutil
+        
         # Open the print service operational log
         hand = win32evtlog.OpenEventLog(None, "Microsoft-Windows-PrintService/Operational")
         flags = win32evtlog.EVENTLOG_BACKWARDS_READ | win32evtlog.EVENTLOG_SEQUENTIAL_READ
@@ -220,22 +224,36 @@ def get_free_printer_pair() -> Optional[Dict[str, str]]:
     return None
 
 
+def parse_file_name(file_name: str) -> Optional[Tuple[str, str]]:
+    """Get the file type ("Photo" or "Label") and ID from a file name, or None if it is neither."""
+    photo_match = re.match(r"^photo(\d+).*", file_name)
+    label_match = re.match(r"^label(\d+).*", file_name)
+    
+    if photo_match:
+        return "Photo", photo_match.group(1)
+    elif label_match:
+        return "Label", label_match.group(1)
+    return None
+
+
 def find_matching_files(file_id: str, master_folder: Path) -> Tuple[Optional[Path], Optional[Path]]:
     """Find matching photo and label files for a given ID."""
-    photo_pattern = f"photo{file_id}*"
-    label_pattern = f"label{file_id}*"
+    photo_prefix = f"photo{file_id}"
+    label_prefix = f"label{file_id}"
     
     photo_file = None
     label_file = None
     
-    for file_path in master_folder.glob("*"):
-        if file_path.name in PROCESSED_FILES:
-            continue
-            
-        if file_path.name.startswith(f"photo{file_id}"):
-            photo_file = file_path
-        elif file_path.name.startswith(f"label{file_id}"):
-            label_file = file_path
+    # Compare raw entry names so a backed-up folder doesn't cost a Path object per file
+    with os.scandir(master_folder) as entries:
+        for entry in entries:
+            if entry.name in PROCESSED_FILES:
+                continue
+                
+            if entry.name.startswith(photo_prefix):
+                photo_file = Path(entry.path)
+            elif entry.name.startswith(label_prefix):
+                label_file = Path(entry.path)
     
     return photo_file, label_file
 
@@ -244,8 +262,8 @@ def move_files_to_printer_folders(photo_file: Path, label_file: Path, printer_pa
     """Move photo and label files to their respective printer folders."""
     try:
         # Create destination paths
-        photo_dest = Path(f"C:/Users/colem/Desktop/{printer_pair['photo']}/")
-        label_dest = Path(f"C:/Users/colem/Desktop/{printer_pair['label']}/")
+        photo_dest = Path(PRINTER_FOLDER_ROOT) / printer_pair['photo']
+        label_dest = Path(PRINTER_FOLDER_ROOT) / printer_pair['label']
         
         # Ensure destination folders exist
         photo_dest.mkdir(parents=True, exist_ok=True)
@@ -292,25 +310,18 @@ class FileHandler(FileSystemEventHandler):
             return
         
         # Wait a bit for file to be fully written
-        time.sleep(0.2)
+        time.sleep(FILE_SETTLE_DELAY)
         
         # Skip if already processed
         if file_name in PROCESSED_FILES:
             return
         
         # Extract file type and ID
-        photo_match = re.match(r"^photo(\d+).*", file_name)
-        label_match = re.match(r"^label(\d+).*", file_name)
-        
-        if photo_match:
-            file_type = "Photo"
-            file_id = photo_match.group(1)
-        elif label_match:
-            file_type = "Label"
-            file_id = label_match.group(1)
-        else:
+        parsed = parse_file_name(file_name)
+        if not parsed:
             logger.info(f"File does not match photo or label pattern: {file_name}")
             return
+        file_type, file_id = parsed
         
         logger.info(f"Detected {file_type} with ID {file_id} for file: {file_name}")
         
@@ -338,6 +349,7 @@ class FileHandler(FileSystemEventHandler):
 
 def main():
     """Main function to start the file watcher."""
+    setup_logging()
     master_path = Path(MASTER_FOLDER)
     
     # Ensure master folder exists
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Replay Simulation for Picture Pros Folder Script
+Parses picture_pros.log into an arrival trace and replays it through the real FileHandler
+pairing and dispatch logic using a virtual clock and simulated printers, then reports queue
+waits, throughput and utilization for each printer pair count and scheduling policy.
+"""
+
+import argparse
+import heapq
+import logging
+import math
+import re
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from watchdog.events import FileCreatedEvent
+
+import picture_pros_folder_script as pps
+
+LOG_LINE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - \w+ - (.*)$")
+DETECTED_PATTERN = re.compile(r"^Detected (?:Photo|Label) with ID \d+ for file: (.+)$")
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+POLICIES = ["first-free", "round-robin", "least-used"]
+
+# Event kinds, ordered so printers freed at an instant are seen before arrivals at that instant
+PRINTER_FREE = 0
+ARRIVAL = 1
+
+# Module state in picture_pros_folder_script that a replay swaps out and restores
+PATCHED_ATTRIBUTES = [
+    "PRINTER_PAIRS", "PRINTER_FOLDER_MAP", "PRINTER_STATUS", "PROCESSED_FILES",
+    "LAST_PRINTED_DOCUMENT", "PRINTER_FOLDER_ROOT", "FILE_SETTLE_DELAY",
+    "is_printer_free", "move_files_to_printer_folders"
+]
+
+
+def parse_arrivals(log_paths: List[Path], date: Optional[str] = None) -> Dict[str, List[Tuple[datetime, str]]]:
+    """Build an arrival trace of (timestamp, file name) per day from the "Detected ..." log lines."""
+    arrivals = {}
+
+    for log_path in log_paths:
+        with open(log_path, encoding="utf-8", errors="replace") as log_file:
+            for line in log_file:
+                line_match = LOG_LINE_PATTERN.match(line.rstrip("\n"))
+                if not line_match:
+                    continue
+                if date and not line_match.group(1).startswith(date):
+                    continue
+
+                detected_match = DETECTED_PATTERN.match(line_match.group(2))
+                if not detected_match:
+                    continue
+
+                # A file is only detected once per creation, keep the first sighting that day
+                timestamp = datetime.strptime(line_match.group(1), TIMESTAMP_FORMAT)
+                key = (line_match.group(1)[:10], detected_match.group(1))
+                if key not in arrivals or timestamp < arrivals[key]:
+                    arrivals[key] = timestamp
+
+    traces = {}
+    for (day, file_name), timestamp in sorted(arrivals.items(), key=lambda item: item[1]):
+        traces.setdefault(day, []).append((timestamp, file_name))
+    return traces
+
+
+def make_printer_pairs(pair_count: int) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+    """Build PRINTER_PAIRS and PRINTER_FOLDER_MAP entries for the given number of pairs."""
+    printer_pairs = []
+    folder_map = {}
+
+    for i in range(1, pair_count + 1):
+        photo_folder = f"PhotoPool{i}"
+        label_folder = f"LabelPool{i}"
+        printer_pairs.append({"photo": photo_folder, "label": label_folder})
+        folder_map[photo_folder] = pps.PRINTER_FOLDER_MAP.get(photo_folder, f"P{i}")
+        folder_map[label_folder] = pps.PRINTER_FOLDER_MAP.get(label_folder, f"LP-{i}")
+
+    return printer_pairs, folder_map
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+class VirtualClockFilter(logging.Filter):
+    """Stamp the watcher's log records with the simulation's virtual time instead of the wall clock."""
+
+    def __init__(self, simulation: "ReplaySimulation"):
+        super().__init__()
+        self.simulation = simulation
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        virtual_time = self.simulation.start.timestamp() + self.simulation.now
+        record.created = virtual_time
+        record.msecs = (virtual_time - int(virtual_time)) * 1000
+        return True
+
+
+class ReplaySimulation:
+    """Replay an arrival trace through FileHandler against simulated printers."""
+
+    def __init__(self, start: datetime, arrivals: List[Tuple[float, str]], pair_count: int,
+                 policy: str, photo_seconds: float, label_seconds: float):
+        self.start = start
+        self.arrivals = arrivals
+        self.pair_count = pair_count
+        self.policy = policy
+        self.photo_seconds = photo_seconds
+        self.label_seconds = label_seconds
+
+        self.printer_pairs, self.folder_map = make_printer_pairs(pair_count)
+        self.now = 0.0
+        self.events = []
+        self.sequence = 0
+        self.arrival_times = {}
+        self.busy_until = {printer: 0.0 for printer in self.folder_map.values()}
+        self.busy_seconds = {printer: 0.0 for printer in self.folder_map.values()}
+        self.last_pair_index = -1
+        self.waiting = {}
+        self.files_by_id = {}
+        self.prefix_files = {"Photo": {}, "Label": {}}
+        self.on_disk = set()
+        self.ready = {}
+        self.ready_counts = {"Photo": 0, "Label": 0}
+        self.ready_heap = []
+        self.max_queue_length = 0
+        self.waits = []
+        self.last_free_time = 0.0
+        self.originals = {}
+        self.clock_filter = VirtualClockFilter(self)
+
+    def run(self) -> Dict[str, float]:
+        """Run the replay and return its summary statistics."""
+        with tempfile.TemporaryDirectory() as work_dir:
+            master_path = Path(work_dir) / "MasterPrintFolder"
+            master_path.mkdir()
+            handler = pps.FileHandler(master_path)
+
+            self._install(work_dir)
+            try:
+                for offset, file_name in self.arrivals:
+                    self._schedule(offset, ARRIVAL, file_name)
+
+                while self.events:
+                    self.now, kind, _, file_name = heapq.heappop(self.events)
+                    if kind == ARRIVAL:
+                        self._arrive(handler, master_path, file_name)
+                    else:
+                        self._drain_queue(handler, master_path)
+
+                unpaired = len(self.waiting)
+            finally:
+                self._restore()
+
+        return self._summarize(unpaired)
+
+    def _install(self, work_dir: str):
+        """Point the watcher's module state at this simulation."""
+        for name in PATCHED_ATTRIBUTES:
+            self.originals[name] = getattr(pps, name)
+
+        pps.PRINTER_PAIRS = list(self.printer_pairs)
+        pps.PRINTER_FOLDER_MAP = self.folder_map
+        pps.PRINTER_STATUS = {folder: "Free" for folder in self.folder_map}
+        pps.PROCESSED_FILES = set()
+        pps.LAST_PRINTED_DOCUMENT = {}
+        pps.PRINTER_FOLDER_ROOT = work_dir
+        pps.FILE_SETTLE_DELAY = 0
+        pps.is_printer_free = self._is_printer_free
+        pps.move_files_to_printer_folders = self._move_files
+        pps.logger.addFilter(self.clock_filter)
+
+    def _restore(self):
+        """Put the watcher's module state back the way it was."""
+        for name, value in self.originals.items():
+            setattr(pps, name, value)
+        pps.logger.removeFilter(self.clock_filter)
+
+    def _schedule(self, when: float, kind: int, file_name: Optional[str] = None):
+        heapq.heappush(self.events, (when, kind, self.sequence, file_name))
+        self.sequence += 1
+
+    def _is_printer_free(self, printer_name: str) -> bool:
+        return self.busy_until[printer_name] <= self.now
+
+    def _move_files(self, photo_file: Path, label_file: Path, printer_pair: Dict[str, str]) -> bool:
+        """Run the real move, then occupy the chosen printers for their print time."""
+        if not self.originals["move_files_to_printer_folders"](photo_file, label_file, printer_pair):
+            return False
+
+        ready_time = max(self.arrival_times[photo_file.name], self.arrival_times[label_file.name])
+        self.waits.append(self.now - ready_time)
+        self._remove_waiting(photo_file.name)
+        self._remove_waiting(label_file.name)
+
+        self.last_pair_index = self.printer_pairs.index(printer_pair)
+        for folder, seconds in ((printer_pair["photo"], self.photo_seconds),
+                                (printer_pair["label"], self.label_seconds)):
+            printer = self.folder_map[folder]
+            self.busy_until[printer] = self.now + seconds
+            self.busy_seconds[printer] += seconds
+
+        # The pair is only usable again once both of its printers are done
+        pair_free_time = self.now + max(self.photo_seconds, self.label_seconds)
+        self.last_free_time = max(self.last_free_time, pair_free_time)
+        self._schedule(pair_free_time, PRINTER_FREE)
+        return True
+
+    def _add_waiting(self, file_name: str, file_type: str, file_id: str):
+        self.waiting[file_name] = (file_type, file_id, self.sequence)
+        self.sequence += 1
+        self.files_by_id.setdefault(file_id, set()).add(file_name)
+        for end in range(1, len(file_id) + 1):
+            self.prefix_files[file_type].setdefault(file_id[:end], set()).add(file_name)
+        self._refresh_ready(file_id)
+
+    def _remove_waiting(self, file_name: str):
+        file_type, file_id, _ = self.waiting.pop(file_name)
+        self.files_by_id[file_id].discard(file_name)
+        for end in range(1, len(file_id) + 1):
+            self.prefix_files[file_type][file_id[:end]].discard(file_name)
+        self.on_disk.discard(file_name)
+        self._set_ready(file_name, False)
+        self._refresh_ready(file_id)
+
+    def _is_pairable(self, file_id: str) -> bool:
+        """Whether find_matching_files would find both files for this ID, which matches by prefix."""
+        return bool(self.prefix_files["Photo"].get(file_id)) and bool(self.prefix_files["Label"].get(file_id))
+
+    def _set_ready(self, file_name: str, ready: bool):
+        if ready and file_name not in self.ready:
+            file_type, _, sequence = self.waiting[file_name]
+            self.ready[file_name] = file_type
+            self.ready_counts[file_type] += 1
+            heapq.heappush(self.ready_heap, (sequence, file_name))
+        elif not ready and file_name in self.ready:
+            self.ready_counts[self.ready.pop(file_name)] -= 1
+
+    def _refresh_ready(self, file_id: str):
+        """Re-check waiting files whose ID is a prefix of file_id, the only ones a change can affect."""
+        for end in range(1, len(file_id) + 1):
+            prefix = file_id[:end]
+            pairable = self._is_pairable(prefix)
+            for file_name in self.files_by_id.get(prefix, ()):
+                self._set_ready(file_name, pairable)
+
+    def _queue_length(self) -> int:
+        """Number of complete pairs waiting for a printer pair."""
+        return min(self.ready_counts["Photo"], self.ready_counts["Label"])
+
+    def _any_pair_free(self) -> bool:
+        return any(
+            self._is_printer_free(self.folder_map[pair["photo"]])
+            and self._is_printer_free(self.folder_map[pair["label"]])
+            for pair in self.printer_pairs
+        )
+
+    def _order_pairs(self):
+        """Order PRINTER_PAIRS so get_free_printer_pair picks according to the policy."""
+        if self.policy == "round-robin":
+            start = (self.last_pair_index + 1) % len(self.printer_pairs)
+            pps.PRINTER_PAIRS = self.printer_pairs[start:] + self.printer_pairs[:start]
+        elif self.policy == "least-used":
+            pps.PRINTER_PAIRS = sorted(
+                self.printer_pairs,
+                key=lambda pair: self.busy_seconds[self.folder_map[pair["photo"]]]
+            )
+        else:
+            pps.PRINTER_PAIRS = list(self.printer_pairs)
+
+    def _offer(self, handler: pps.FileHandler, master_path: Path, file_name: str):
+        """Hand a waiting file to the handler as if it had just been created.
+
+        Only waiting files whose name starts with photo{ID} or label{ID} can affect what
+        find_matching_files returns for this ID, so just those are written to the master
+        folder. Keeping the rest in memory stops a backed-up replay from rescanning them all.
+        """
+        file_id = self.waiting[file_name][1]
+        for file_type in ("Photo", "Label"):
+            for candidate in self.prefix_files[file_type].get(file_id, ()):
+                if candidate not in self.on_disk:
+                    (master_path / candidate).write_bytes(b"")
+                    self.on_disk.add(candidate)
+
+        self._order_pairs()
+        handler.on_created(FileCreatedEvent(str(master_path / file_name)))
+
+    def _arrive(self, handler: pps.FileHandler, master_path: Path, file_name: str):
+        """Add an arriving file to the waiting index and dispatch whatever it makes pairable.
+
+        Waiting files are indexed in memory, so the handler is only called when it can actually
+        dispatch a pair. Otherwise it would just log that it is waiting.
+        """
+        self.arrival_times[file_name] = self.now
+
+        parsed = pps.parse_file_name(file_name)
+        if parsed:
+            self._add_waiting(file_name, *parsed)
+
+        self._drain_queue(handler, master_path)
+        self.max_queue_length = max(self.max_queue_length, self._queue_length())
+
+    def _drain_queue(self, handler: pps.FileHandler, master_path: Path):
+        """Offer pairable files to the handler in arrival order while a printer pair is free.
+
+        The live watcher only dispatches from on_created, so this stands in for a retry
+        loop and is what makes the reported queue waits meaningful. A file stays queued until
+        it is moved or no longer pairable, even if a dispatch took files from another ID.
+        """
+        while self.ready_heap and self._any_pair_free():
+            _, file_name = self.ready_heap[0]
+            if file_name not in self.ready:
+                heapq.heappop(self.ready_heap)
+                continue
+
+            jobs_before = len(self.waits)
+            self._offer(handler, master_path, file_name)
+            if len(self.waits) == jobs_before:
+                # The handler could not place it, drop it so it can't stall the queue
+                heapq.heappop(self.ready_heap)
+                self._set_ready(file_name, False)
+
+    def _summarize(self, unpaired: int) -> Dict[str, float]:
+        first_arrival = self.arrivals[0][0] if self.arrivals else 0.0
+        last_event = max(self.last_free_time, self.arrivals[-1][0] if self.arrivals else 0.0)
+        makespan = max(last_event - first_arrival, 1e-9)
+
+        photo_printers = [self.folder_map[pair["photo"]] for pair in self.printer_pairs]
+        label_printers = [self.folder_map[pair["label"]] for pair in self.printer_pairs]
+
+        return {
+            "jobs": len(self.waits),
+            "unpaired": unpaired,
+            "wait_avg": sum(self.waits) / len(self.waits) if self.waits else 0.0,
+            "wait_p95": percentile(self.waits, 0.95),
+            "wait_max": max(self.waits, default=0.0),
+            "max_queue": self.max_queue_length,
+            "jobs_per_hour": len(self.waits) / makespan * 3600,
+            "photo_util": sum(self.busy_seconds[p] for p in photo_printers) / (makespan * len(photo_printers)),
+            "label_util": sum(self.busy_seconds[p] for p in label_printers) / (makespan * len(label_printers)),
+            "busiest_util": max(self.busy_seconds[p] for p in photo_printers) / makespan,
+        }
+
+
+def print_report(results: List[Tuple[int, str, Dict[str, float]]]):
+    """Print one row of statistics per configuration."""
+    header = (f"{'Pairs':>5}  {'Policy':<11}  {'Jobs':>6}  {'Unpaired':>8}  {'Wait avg':>9}  "
+              f"{'Wait p95':>9}  {'Wait max':>9}  {'Max queue':>9}  {'Jobs/hour':>9}  "
+              f"{'Photo util':>10}  {'Label util':>10}  {'Busiest photo':>13}")
+    print(header)
+    print("-" * len(header))
+    for pair_count, policy, stats in results:
+        print(f"{pair_count:>5}  {policy:<11}  {stats['jobs']:>6}  {stats['unpaired']:>8}  "
+              f"{stats['wait_avg']:>8.1f}s  {stats['wait_p95']:>8.1f}s  {stats['wait_max']:>8.1f}s  "
+              f"{stats['max_queue']:>9}  {stats['jobs_per_hour']:>9.1f}  "
+              f"{stats['photo_util']:>10.1%}  {stats['label_util']:>10.1%}  {stats['busiest_util']:>13.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay picture_pros.log traffic against simulated printer pairs and policies."
+    )
+    parser.add_argument("logs", nargs="*", type=Path, default=[Path("picture_pros.log")],
+                        help="log files to replay (default: picture_pros.log)")
+    parser.add_argument("--date", help="only replay traffic from this day (YYYY-MM-DD)")
+    parser.add_argument("--pairs", nargs="+", type=int, default=[len(pps.PRINTER_PAIRS)],
+                        help="printer pair counts to simulate (default: %(default)s)")
+    parser.add_argument("--policy", nargs="+", choices=POLICIES, default=["first-free"],
+                        help="pair selection policies to simulate (default: first-free)")
+    parser.add_argument("--photo-seconds", type=float, default=60.0,
+                        help="simulated print time per photo (default: %(default)s)")
+    parser.add_argument("--label-seconds", type=float, default=10.0,
+                        help="simulated print time per label (default: %(default)s)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="show the watcher's own log output, stamped with simulated time")
+    args = parser.parse_args()
+
+    if any(pair_count < 1 for pair_count in args.pairs):
+        parser.error("--pairs values must be at least 1")
+    if args.photo_seconds < 0 or args.label_seconds < 0:
+        parser.error("--photo-seconds and --label-seconds must not be negative")
+    missing_logs = [str(log_path) for log_path in args.logs if not log_path.is_file()]
+    if missing_logs:
+        parser.error(f"log file not found: {', '.join(missing_logs)}")
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    else:
+        pps.logger.setLevel(logging.ERROR)
+
+    traces = parse_arrivals(args.logs, args.date)
+    if not traces:
+        print("No detected files found in the given logs.")
+        return
+
+    print(f"Print time: photo {args.photo_seconds:g}s, label {args.label_seconds:g}s")
+
+    # Each day is replayed on its own so overnight gaps don't dilute throughput and utilization
+    for day, trace in sorted(traces.items()):
+        start = trace[0][0]
+        arrivals = [((timestamp - start).total_seconds(), file_name) for timestamp, file_name in trace]
+        print()
+        print(f"=== {day}: {len(arrivals)} files from {start:%H:%M:%S} to {trace[-1][0]:%H:%M:%S} ===")
+
+        results = []
+        for pair_count in args.pairs:
+            for policy in args.policy:
+                if args.verbose:
+                    print(f"--- {pair_count} pairs, {policy} ---")
+                simulation = ReplaySimulation(start, arrivals, pair_count, policy,
+                                              args.photo_seconds, args.label_seconds)
+                results.append((pair_count, policy, simulation.run()))
+
+        print_report(results)
+
+    if len(args.policy) > 1:
+        print()
+        print("Note: every pair prints at the same speed, so policy only changes how work is spread")
+        print("across printers (Busiest photo), not waits, throughput or average utilization.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the replay simulation (run with: python -m pytest test_replay_simulation.py)
+"""
+
+from datetime import datetime
+
+import picture_pros_folder_script as pps
+from replay_simulation import ReplaySimulation, parse_arrivals, percentile
+
+START = datetime(2026, 10, 18, 8, 0, 0)
+
+
+def run_trace(arrivals, pair_count=1, policy="first-free"):
+    """Replay (offset, file name) arrivals with 60s photos and 10s labels."""
+    return ReplaySimulation(START, arrivals, pair_count, policy, 60.0, 10.0).run()
+
+
+def test_parse_arrivals_dedups_per_day_and_splits_days(tmp_path):
+    log_path = tmp_path / "picture_pros.log"
+    log_path.write_text(
+        "2026-10-18 08:00:05,000 - INFO - Detected Photo with ID 1 for file: photo1.jpg\n"
+        "2026-10-18 08:00:01,000 - INFO - Detected Photo with ID 1 for file: photo1.jpg\n"
+        "2026-10-18 08:00:02,000 - INFO - Waiting for matching pair for ID 1\n"
+        "2026-10-18 08:00:03,000 - INFO - Detected Label with ID 1 for file: label1.pdf\n"
+        "2026-10-19 09:00:00,000 - INFO - Detected Photo with ID 1 for file: photo1.jpg\n"
+        "not a log line\n"
+    )
+
+    traces = parse_arrivals([log_path])
+
+    assert traces == {
+        "2026-10-18": [(datetime(2026, 10, 18, 8, 0, 1), "photo1.jpg"),
+                       (datetime(2026, 10, 18, 8, 0, 3), "label1.pdf")],
+        "2026-10-19": [(datetime(2026, 10, 19, 9, 0, 0), "photo1.jpg")],
+    }
+    assert list(parse_arrivals([log_path], "2026-10-19")) == ["2026-10-19"]
+
+
+def test_percentile_uses_nearest_rank():
+    assert percentile(list(range(1, 31)), 0.95) == 29
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert percentile([7.0], 0.95) == 7.0
+    assert percentile([], 0.95) == 0.0
+
+
+def test_run_reports_waits_and_queue_length():
+    stats = run_trace([(0, "photo1.jpg"), (1, "label1.pdf"), (2, "photo2.jpg"), (3, "label2.pdf")])
+
+    # Pair 1 goes out at 1s, pair 2 waits until the printers free up at 61s
+    assert stats["jobs"] == 2
+    assert stats["unpaired"] == 0
+    assert stats["wait_max"] == 58.0
+    assert stats["wait_avg"] == 29.0
+    assert stats["max_queue"] == 1
+
+
+def test_run_with_free_printers_never_queues():
+    stats = run_trace([(0, "photo1.jpg"), (1, "label1.pdf"), (2, "photo2.jpg"), (3, "label2.pdf")],
+                      pair_count=2)
+
+    assert stats["jobs"] == 2
+    assert stats["wait_max"] == 0.0
+    assert stats["max_queue"] == 0
+
+
+def test_run_pairs_by_id_prefix_like_the_watcher():
+    # find_matching_files matches on startswith, so label80 pairs with photo800
+    stats = run_trace([(0, "photo800.jpg"), (1, "label80.pdf")])
+
+    assert stats["jobs"] == 1
+    assert stats["unpaired"] == 0
+
+
+def test_run_keeps_pairs_queued_when_another_id_takes_their_files():
+    stats = run_trace([(0, "photo9.jpg"), (1, "label9.pdf"), (2, "photo1.jpg"),
+                       (3, "label1.pdf"), (4, "photo10.jpg"), (5, "label10.pdf")])
+
+    assert stats["jobs"] == 3
+    assert stats["unpaired"] == 0
+    assert stats["max_queue"] == 2
+
+
+def test_run_restores_watcher_state():
+    printer_pairs = pps.PRINTER_PAIRS
+    move_files = pps.move_files_to_printer_folders
+
+    run_trace([(0, "photo1.jpg"), (1, "label1.pdf")], pair_count=3)
+
+    assert pps.PRINTER_PAIRS is printer_pairs
+    assert pps.move_files_to_printer_folders is move_files
+    assert pps.logger.filters == []